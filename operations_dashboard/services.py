@@ -416,7 +416,7 @@ def analyze_dashboard_history(
             "time_series": {},
         }
     context.repository.initialize()
-    summaries = context.repository.fetch_recent_summaries(limit=limit)
+    summaries = list(context.repository.fetch_recent_summaries(limit=limit))
     if not summaries:
         return {
             "analysis": {"error": "数据库暂无历史记录。"},
@@ -474,7 +474,7 @@ def export_dashboard_history(
     if not context.repository:
         return {"message": "未启用数据库持久化，无法导出历史数据。"}
     context.repository.initialize()
-    summaries = context.repository.fetch_recent_summaries(limit=limit)
+    summaries = list(context.repository.fetch_recent_summaries(limit=limit))
     if not summaries:
         return {"message": "数据库暂无可导出的历史记录。"}
     output_path = Path(path)
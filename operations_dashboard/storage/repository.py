@@ -2,16 +2,216 @@
 
 from __future__ import annotations
 
+import array
+import itertools
+import queue
 import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from ..metrics.calculations import DashboardSummary, ProductPerformance
 
+# 建表与建索引语句逐条列出：executescript 会先隐式 COMMIT 再执行脚本，
+# 无法保证原子性；initialize 在 BEGIN EXCLUSIVE 事务内逐条执行这些语句，
+# 并发进程启动时也不会看到半初始化的库。
+_SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS summaries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        start_date INTEGER NOT NULL,
+        end_date INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        total_revenue REAL NOT NULL,
+        total_units INTEGER NOT NULL,
+        total_sessions INTEGER NOT NULL,
+        conversion_rate REAL NOT NULL,
+        refund_rate REAL NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        summary_id INTEGER NOT NULL,
+        asin TEXT NOT NULL,
+        title TEXT NOT NULL,
+        revenue REAL NOT NULL,
+        units INTEGER NOT NULL,
+        sessions INTEGER NOT NULL,
+        conversion_rate REAL NOT NULL,
+        refunds INTEGER NOT NULL,
+        buy_box_percentage REAL,
+        UNIQUE(summary_id, asin),
+        FOREIGN KEY(summary_id) REFERENCES summaries(id) ON DELETE CASCADE
+    )
+    """,
+    # 覆盖热点查询路径：按开始日期倒序取摘要、按摘要取商品并按
+    # 销售额排序，均可走索引、免去全表扫描与额外排序。
+    "CREATE INDEX IF NOT EXISTS idx_summaries_start ON summaries(start_date DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_products_summary_revenue ON products(summary_id, revenue DESC)",
+    # 含全部摘要列的覆盖索引：按开始日期取摘要可整条命中索引，
+    # 无需再回表读主 B 树。
+    """
+    CREATE INDEX IF NOT EXISTS idx_summaries_covering
+        ON summaries(start_date, id DESC, source, total_revenue,
+                     total_units, total_sessions, conversion_rate,
+                     refund_rate, created_at, end_date)
+    """,
+)
+
+
+# 日期在库内统一存为 UTC 零点的 Unix 时间戳（INTEGER）：整数比较快于
+# 文本排序，索引项也更紧凑；对外仍以 ISO 字符串交互。
+def _date_to_epoch(value: date) -> int:
+    """把日期转换为对应 UTC 零点的 Unix 时间戳。"""
+    return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+
+
+def _epoch_to_iso(value: int) -> str:
+    """把 Unix 时间戳还原为 ISO 日期字符串。"""
+    return datetime.fromtimestamp(value, tz=timezone.utc).date().isoformat()
+
+
+# SQL 语句统一定义为模块级常量：sqlite3 的语句缓存按字符串精确匹配，
+# 固定的单行文本可保证每次调用都命中缓存，也省去重复构造大字符串的开销。
+_SQL_INSERT_SUMMARY = (
+    "INSERT INTO summaries (start_date, end_date, source, total_revenue, total_units, "
+    "total_sessions, conversion_rate, refund_rate, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# 冲突时走 ON CONFLICT DO UPDATE 原地更新，避免 INSERT OR REPLACE 的
+# 先删后插（重写 B 树页、重分配 rowid，并可能触发级联删除）。
+_SQL_INSERT_PRODUCT_PREFIX = (
+    "INSERT INTO products (summary_id, asin, title, revenue, units, sessions, "
+    "conversion_rate, refunds, buy_box_percentage) VALUES "
+)
 
-@dataclass
+_SQL_INSERT_PRODUCT_SUFFIX = (
+    " ON CONFLICT(summary_id, asin) DO UPDATE SET title=excluded.title, "
+    "revenue=excluded.revenue, units=excluded.units, sessions=excluded.sessions, "
+    "conversion_rate=excluded.conversion_rate, refunds=excluded.refunds, "
+    "buy_box_percentage=excluded.buy_box_percentage"
+)
+
+_PRODUCT_ROW_PLACEHOLDER = "(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# 每累计多少次 save_summary 自动截断一次 WAL，防止 -wal 文件无限增长。
+_CHECKPOINT_INTERVAL = 64
+
+# 异步写入时单个事务最多合并的摘要数，避免单次事务占锁过久。
+_ASYNC_BATCH_SIZE = 32
+
+
+_SQL_SELECT_PRODUCTS = (
+    "SELECT asin, title, revenue, units, sessions, conversion_rate, refunds, "
+    "buy_box_percentage FROM products WHERE summary_id = ? ORDER BY revenue DESC"
+)
+
+_SQL_SELECT_PRODUCTS_IN_PREFIX = (
+    "SELECT summary_id, asin, title, revenue, units, sessions, conversion_rate, "
+    "refunds, buy_box_percentage FROM products WHERE summary_id IN ("
+)
+
+
+@lru_cache(maxsize=64)
+def _products_in_sql(id_count: int) -> str:
+    """
+    功能说明:
+        生成按 summary_id IN (...) 批量取商品的查询语句。
+
+        按 ID 数量缓存生成结果，保证 sqlite3 语句缓存依旧命中。
+    参数:
+        id_count (int): 摘要 ID 数量。
+    返回:
+        str: 完整的 SELECT 语句。
+    """
+    placeholders = ", ".join("?" * id_count)
+    return (
+        _SQL_SELECT_PRODUCTS_IN_PREFIX
+        + placeholders
+        + ") ORDER BY summary_id, revenue DESC"
+    )
+
+
+@lru_cache(maxsize=64)
+def _product_insert_sql(row_count: int) -> str:
+    """
+    功能说明:
+        生成一次写入 row_count 行商品的多行 VALUES 语句。
+
+        单条多行插入比 executemany 少走每行一次的 VDBE 执行与参数绑定；
+        按行数缓存生成结果，保证 sqlite3 语句缓存依旧命中。
+    参数:
+        row_count (int): 商品行数。
+    返回:
+        str: 完整的 INSERT 语句。
+    """
+    return (
+        _SQL_INSERT_PRODUCT_PREFIX
+        + ", ".join([_PRODUCT_ROW_PLACEHOLDER] * row_count)
+        + _SQL_INSERT_PRODUCT_SUFFIX
+    )
+
+# 摘要与商品通过一次 LEFT JOIN 取回，避免按摘要逐条查询商品的 N+1 模式；
+# 行在 Python 侧按 summary id 分组还原。
+_SQL_SELECT_SUMMARY_COLUMNS = (
+    "s.id, s.start_date, s.end_date, s.source, s.total_revenue, s.total_units, "
+    "s.total_sessions, s.conversion_rate, s.refund_rate, s.created_at, "
+    "p.asin, p.title, p.revenue, p.units, p.sessions, p.conversion_rate, "
+    "p.refunds, p.buy_box_percentage"
+)
+
+_SQL_SELECT_RECENT = (
+    f"SELECT {_SQL_SELECT_SUMMARY_COLUMNS} FROM summaries s "
+    "LEFT JOIN products p ON p.summary_id = s.id "
+    "WHERE s.id IN (SELECT id FROM summaries ORDER BY start_date DESC, id DESC LIMIT ?) "
+    "ORDER BY s.start_date DESC, s.id DESC, p.revenue DESC"
+)
+
+# 同日期每次刷新都会新增一条摘要，MAX(id) 子查询把结果锁定到最新一条，
+# 不会连带取出全部重复摘要的商品行；日期参数需传两次。INDEXED BY 把
+# 摘要行钉在覆盖索引上（规划器默认偏向 rowid 探测），整行从索引取得、
+# 无需回表，代价只是对单条摘要的商品行做一次小排序。
+_SQL_SELECT_BY_START = (
+    f"SELECT {_SQL_SELECT_SUMMARY_COLUMNS} "
+    "FROM summaries s INDEXED BY idx_summaries_covering "
+    "LEFT JOIN products p ON p.summary_id = s.id "
+    "WHERE s.start_date = ? AND s.id = (SELECT MAX(id) FROM summaries WHERE start_date = ?) "
+    "ORDER BY p.revenue DESC"
+)
+
+# top_n 变体：商品侧用关联子查询限定每条摘要的前 N 行。子查询按
+# summary_id 关联，规划器可将其下推到 idx_products_summary_revenue 上做
+# 索引区间扫描（窗口函数子查询会被整体物化、全表扫描，不可取）。
+_SQL_TOP_PRODUCTS_JOIN = (
+    "LEFT JOIN products p ON p.summary_id = s.id AND p.id IN "
+    "(SELECT id FROM products WHERE summary_id = s.id ORDER BY revenue DESC LIMIT ?) "
+)
+
+_SQL_SELECT_RECENT_TOP = (
+    f"SELECT {_SQL_SELECT_SUMMARY_COLUMNS} FROM summaries s "
+    + _SQL_TOP_PRODUCTS_JOIN
+    + "WHERE s.id IN (SELECT id FROM summaries ORDER BY start_date DESC, id DESC LIMIT ?) "
+    "ORDER BY s.start_date DESC, s.id DESC, p.revenue DESC"
+)
+
+_SQL_SELECT_BY_START_TOP = (
+    f"SELECT {_SQL_SELECT_SUMMARY_COLUMNS} "
+    "FROM summaries s INDEXED BY idx_summaries_covering "
+    + _SQL_TOP_PRODUCTS_JOIN
+    + "WHERE s.start_date = ? AND s.id = (SELECT MAX(id) FROM summaries WHERE start_date = ?) "
+    "ORDER BY p.revenue DESC"
+)
+
+
+@dataclass(slots=True, frozen=True)
 class StoredProduct:
     """
     表示存储在 products 表中的一行数据。
@@ -37,7 +237,7 @@ class StoredProduct:
     buy_box_percentage: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StoredSummary:
     """
     表示存储在 summaries 表中的聚合摘要。
@@ -76,25 +276,201 @@ class SQLiteRepository:
     负责初始化表结构、写入摘要与商品记录，以及读取历史数据。
     """
 
-    def __init__(self, db_path: Path | str) -> None:
+    def __init__(self, db_path: Path | str, read_pool_size: int = 4) -> None:
         self._db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._saves_since_checkpoint = 0
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._write_queue: "queue.Queue[tuple[DashboardSummary, Future]]" = queue.Queue()
+        # 读写分离：写操作独占 self._conn，读操作从只读连接池取连接，
+        # WAL 模式下读不阻塞写，多个读线程可并行。
+        self._read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._read_pool_size = read_pool_size
+        self._read_conns_created = 0
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        功能说明:
+            打开新的数据库连接并应用统一的性能 PRAGMA 配置。
+
+            journal_mode=WAL 配合 synchronous=NORMAL 可大幅降低每次提交的
+            fsync 开销，并允许读写并发；其余 PRAGMA 负责扩大页缓存、启用
+            mmap 与写锁等待，均为 WAL 模式下的安全组合。
+        返回:
+            sqlite3.Connection: 已配置完成的连接。
+        """
+        conn = sqlite3.connect(
+            self._db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=3000;
+            PRAGMA foreign_keys=ON;
+            """
+        )
+        return conn
+
+    def _connect_readonly(self) -> sqlite3.Connection:
+        """
+        功能说明:
+            以只读模式打开新的数据库连接并应用读取侧 PRAGMA。
+
+            只读连接无法触碰日志模式等写相关配置，仅设置缓存、mmap
+            与锁等待参数。
+        返回:
+            sqlite3.Connection: 已配置完成的只读连接。
+        """
+        conn = sqlite3.connect(
+            f"file:{self._db_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.executescript(
+            """
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+            PRAGMA busy_timeout=3000;
+            """
+        )
+        return conn
+
+    def _acquire_read_conn(self) -> sqlite3.Connection:
+        """
+        功能说明:
+            从只读连接池取出一条连接，池未满员时按需新建。
+
+            使用完毕必须经 _release_read_conn 归还；池满且全部被占用
+            时阻塞等待。
+        返回:
+            sqlite3.Connection: 只读连接。
+        """
+        try:
+            return self._read_pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._read_lock:
+            if self._read_conns_created < self._read_pool_size:
+                self._read_conns_created += 1
+                return self._connect_readonly()
+        return self._read_pool.get()
+
+    def _release_read_conn(self, conn: sqlite3.Connection) -> None:
+        """把只读连接归还连接池。"""
+        self._read_pool.put(conn)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        功能说明:
+            返回实例级长连接，不存在时惰性创建。
+
+            复用单条连接可避免每次操作重复 open/close 数据库与
+            -wal/-shm 文件并重新解析 PRAGMA；调用方需持有 self._lock。
+        返回:
+            sqlite3.Connection: 常驻的读写连接。
+        """
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def close(self) -> None:
+        """
+        功能说明:
+            关闭常驻连接；关闭前执行 PRAGMA optimize 以便 SQLite
+            收集统计信息、优化后续查询计划。
+
+            如启用过异步写入，会先等待写线程清空队列再关闭连接。
+        """
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        with self._read_lock:
+            while True:
+                try:
+                    self._read_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._read_conns_created = 0
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
 
     def initialize(self) -> None:
         """
         功能说明:
             确保数据库文件及表结构存在。
+
+            新建数据库会先把页大小调到 32 KiB：商品标题等文本字段较长，
+            大页可减少溢出页读取与 B 树层数。页大小只能在空库上修改，
+            已存在的数据库保持原值不动。
         """
+        is_new_db = not self._db_path.exists()
         if not self._db_path.parent.exists():
             self._db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
+        with self._lock, self._get_conn() as conn:
+            if is_new_db:
+                # 修改页大小要求非 WAL 日志模式，设置后经 VACUUM 生效，
+                # 再切回 WAL 供后续读写使用。
+                conn.executescript(
+                    """
+                    PRAGMA journal_mode=DELETE;
+                    PRAGMA page_size=32768;
+                    VACUUM;
+                    PRAGMA journal_mode=WAL;
+                    """
+                )
+            # 先迁移旧版 TEXT 日期表，再建索引，避免索引在重建中被丢弃。
+            self._migrate_text_dates(conn)
+            # EXCLUSIVE 事务保证并发进程竞争初始化时 DDL 整体可见。
+            conn.execute("BEGIN EXCLUSIVE")
+            try:
+                for statement in _SCHEMA_STATEMENTS:
+                    conn.execute(statement)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _migrate_text_dates(conn: sqlite3.Connection) -> None:
+        """
+        功能说明:
+            将旧版 TEXT 日期列的 summaries 表重建为 INTEGER 时间戳。
+
+            旧表的 TEXT 亲和性会把整数值转回文本，原地 UPDATE 无效，
+            只能整表重建；新库或已迁移的库直接跳过。
+        参数:
+            conn (sqlite3.Connection): 已开启的数据库连接。
+        """
+        row = conn.execute(
+            "SELECT type FROM pragma_table_info('summaries') WHERE name = 'start_date'"
+        ).fetchone()
+        if not row or row[0].upper() != "TEXT":
+            return
+        # 重建期间关闭外键检查，避免 DROP TABLE 级联删除商品行。
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
             conn.executescript(
                 """
-                CREATE TABLE IF NOT EXISTS summaries (
+                BEGIN;
+                CREATE TABLE summaries_migrated (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    start_date TEXT NOT NULL,
-                    end_date TEXT NOT NULL,
+                    start_date INTEGER NOT NULL,
+                    end_date INTEGER NOT NULL,
                     source TEXT NOT NULL,
                     total_revenue REAL NOT NULL,
                     total_units INTEGER NOT NULL,
@@ -103,179 +479,338 @@ class SQLiteRepository:
                     refund_rate REAL NOT NULL,
                     created_at TEXT NOT NULL
                 );
-
-                CREATE TABLE IF NOT EXISTS products (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    summary_id INTEGER NOT NULL,
-                    asin TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    revenue REAL NOT NULL,
-                    units INTEGER NOT NULL,
-                    sessions INTEGER NOT NULL,
-                    conversion_rate REAL NOT NULL,
-                    refunds INTEGER NOT NULL,
-                    buy_box_percentage REAL,
-                    UNIQUE(summary_id, asin),
-                    FOREIGN KEY(summary_id) REFERENCES summaries(id) ON DELETE CASCADE
-                );
+                INSERT INTO summaries_migrated
+                    SELECT id,
+                           CAST(strftime('%s', start_date) AS INTEGER),
+                           CAST(strftime('%s', end_date) AS INTEGER),
+                           source, total_revenue, total_units, total_sessions,
+                           conversion_rate, refund_rate, created_at
+                    FROM summaries;
+                DROP TABLE summaries;
+                ALTER TABLE summaries_migrated RENAME TO summaries;
+                COMMIT;
                 """
             )
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
 
-    def save_summary(self, summary: DashboardSummary) -> int:
+    def save_summary(self, summary: DashboardSummary, created_at: Optional[str] = None) -> int:
         """
         功能说明:
             将 DashboardSummary 持久化至数据库。
         参数:
             summary (DashboardSummary): 仪表盘摘要。
+            created_at (Optional[str]): 创建时间戳，批量写入方可传入
+                同一时间戳以复用；缺省时按当前 UTC 时间生成。
         返回:
             int: 新插入摘要的主键 ID。
         """
-        created_at = datetime.utcnow().isoformat(timespec="seconds")
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute("PRAGMA foreign_keys = ON;")
-            cursor = conn.execute(
-                """
-                INSERT INTO summaries (
-                    start_date, end_date, source,
-                    total_revenue, total_units, total_sessions,
-                    conversion_rate, refund_rate, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    summary.start.isoformat(),
-                    summary.end.isoformat(),
-                    summary.source_name,
-                    summary.totals.total_revenue,
-                    summary.totals.total_units,
-                    summary.totals.total_sessions,
-                    summary.totals.conversion_rate,
-                    summary.totals.refund_rate,
-                    created_at,
-                ),
+        if created_at is None:
+            created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            conn = self._get_conn()
+            # 显式事务让摘要与商品行共享同一次 fsync 与锁升级。
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                summary_id = self._insert_summary(conn, summary, created_at)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._saves_since_checkpoint += 1
+            if self._saves_since_checkpoint >= _CHECKPOINT_INTERVAL:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self._saves_since_checkpoint = 0
+        return summary_id
+
+    def save_summary_async(self, summary: DashboardSummary) -> "Future[int]":
+        """
+        功能说明:
+            将摘要提交给单写线程异步持久化，调用方立即返回。
+
+            写线程一次性取走队列中所有待写摘要（至多 _ASYNC_BATCH_SIZE
+            条）并合并进同一个事务，多条并发提交只付一次 fsync。
+        参数:
+            summary (DashboardSummary): 仪表盘摘要。
+        返回:
+            Future[int]: 完成后携带新插入摘要主键 ID 的 Future。
+        """
+        future: "Future[int]" = Future()
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="sqlite-writer"
+                    )
+        self._write_queue.put((summary, future))
+        self._writer.submit(self._drain_write_queue)
+        return future
+
+    def _drain_write_queue(self) -> None:
+        """
+        功能说明:
+            写线程入口：取空当前队列并在单个事务内批量写入。
+
+            每个提交的摘要对应一个 Future；任一环节失败（包括拿连接和
+            BEGIN 本身，如竞争写进程占锁超过 busy_timeout）都会把异常
+            投递到批内所有 Future，绝不留下永远阻塞的 Future。队列为空
+            （已被前一次调用取走）时直接返回。
+        """
+        batch: List[tuple[DashboardSummary, "Future[int]"]] = []
+        while len(batch) < _ASYNC_BATCH_SIZE:
+            try:
+                batch.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+
+        created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    ids = [
+                        self._insert_summary(conn, summary, created_at)
+                        for summary, _ in batch
+                    ]
+                    conn.execute("COMMIT")
+                except Exception:
+                    # ROLLBACK 本身也可能抛错（如连接已失效），不能让它
+                    # 掩盖原始异常。
+                    try:
+                        conn.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                    raise
+                self._saves_since_checkpoint += len(batch)
+                if self._saves_since_checkpoint >= _CHECKPOINT_INTERVAL:
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                    self._saves_since_checkpoint = 0
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), summary_id in zip(batch, ids):
+            future.set_result(summary_id)
+
+    def checkpoint(self) -> None:
+        """
+        功能说明:
+            立即把 WAL 内容回写主库文件并截断 WAL。
+
+            批量写入结束后调用可回收 -wal 文件空间；日常写入路径也会
+            每隔 _CHECKPOINT_INTERVAL 次保存自动执行一次。
+        """
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._saves_since_checkpoint = 0
+
+    def _insert_summary(
+        self,
+        conn: sqlite3.Connection,
+        summary: DashboardSummary,
+        created_at: str,
+    ) -> int:
+        """
+        功能说明:
+            在已开启的事务内写入摘要及其商品行。
+        参数:
+            conn (sqlite3.Connection): 已开启事务的数据库连接。
+            summary (DashboardSummary): 仪表盘摘要。
+            created_at (str): 创建时间戳。
+        返回:
+            int: 新插入摘要的主键 ID。
+        """
+        cursor = conn.execute(
+            _SQL_INSERT_SUMMARY,
+            (
+                _date_to_epoch(summary.start),
+                _date_to_epoch(summary.end),
+                summary.source_name,
+                summary.totals.total_revenue,
+                summary.totals.total_units,
+                summary.totals.total_sessions,
+                summary.totals.conversion_rate,
+                summary.totals.refund_rate,
+                created_at,
+            ),
+        )
+        summary_id = cursor.lastrowid
+
+        product_rows = [
+            (
+                summary_id,
+                product.asin,
+                product.title,
+                product.revenue,
+                product.units,
+                product.sessions,
+                product.conversion_rate,
+                product.refunds,
+                product.buy_box_percentage,
             )
-            summary_id = cursor.lastrowid
-
-            product_rows = [
-                (
-                    summary_id,
-                    product.asin,
-                    product.title,
-                    product.revenue,
-                    product.units,
-                    product.sessions,
-                    product.conversion_rate,
-                    product.refunds,
-                    product.buy_box_percentage,
-                )
-                for product in summary.top_products
-            ]
-            conn.executemany(
-                """
-                INSERT OR REPLACE INTO products (
-                    summary_id, asin, title, revenue, units, sessions,
-                    conversion_rate, refunds, buy_box_percentage
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                product_rows,
+            for product in summary.top_products
+        ]
+        if product_rows:
+            conn.execute(
+                _product_insert_sql(len(product_rows)),
+                tuple(itertools.chain.from_iterable(product_rows)),
             )
         return summary_id
 
-    def fetch_recent_summaries(self, limit: int = 10) -> List[StoredSummary]:
+    def fetch_recent_summaries(
+        self, limit: int = 10, top_n: Optional[int] = None
+    ) -> Iterator[StoredSummary]:
         """
         功能说明:
-            按时间倒序获取最近的摘要记录。
+            按时间倒序逐条产出最近的摘要记录。
+
+            以生成器形式返回：原始行在归还连接前一次性取回（峰值内存仍
+            随 limit 增长），摘要与商品对象则按需延迟构建；需要列表语义
+            的调用方自行 list(...) 物化。
         参数:
             limit (int): 需要返回的记录数量。
+            top_n (Optional[int]): 每条摘要最多携带的商品数（按销售额
+                倒序截断），在 SQL 内完成过滤；None 表示返回全部商品。
         返回:
-            List[StoredSummary]: 最近的摘要列表。
+            Iterator[StoredSummary]: 最近摘要的迭代器。
         """
-        with sqlite3.connect(self._db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = list(
-                conn.execute(
-                    """
-                    SELECT * FROM summaries
-                    ORDER BY start_date DESC, id DESC
-                    LIMIT ?
-                    """,
-                    (limit,),
-                )
-            )
-            summaries: List[StoredSummary] = []
-            for row in rows:
-                products = self._fetch_products(conn, row["id"])
-                summaries.append(
-                    StoredSummary(
-                        id=row["id"],
-                        start=row["start_date"],
-                        end=row["end_date"],
-                        source=row["source"],
-                        total_revenue=row["total_revenue"],
-                        total_units=row["total_units"],
-                        total_sessions=row["total_sessions"],
-                        conversion_rate=row["conversion_rate"],
-                        refund_rate=row["refund_rate"],
-                        created_at=row["created_at"],
-                        products=products,
-                    )
-                )
-            return summaries
+        if top_n is None:
+            sql, params = _SQL_SELECT_RECENT, (limit,)
+        else:
+            sql, params = _SQL_SELECT_RECENT_TOP, (top_n, limit)
+        conn = self._acquire_read_conn()
+        try:
+            rows = list(conn.execute(sql, params))
+        finally:
+            self._release_read_conn(conn)
+        return self._group_joined_rows(rows)
 
-    def fetch_by_start_date(self, start: str) -> Optional[StoredSummary]:
+    def fetch_by_start_date(
+        self, start: date | str, top_n: Optional[int] = None
+    ) -> Optional[StoredSummary]:
         """
         功能说明:
             按窗口开始日期查询对应的摘要，常用于同比对比。
         参数:
-            start (str): 起始日期，ISO 字符串。
+            start (date | str): 起始日期，date 对象或 ISO 字符串。
+            top_n (Optional[int]): 最多返回的商品数（按销售额倒序截断），
+                None 表示返回全部商品。
         返回:
             Optional[StoredSummary]: 匹配到的摘要或 None。
         """
-        with sqlite3.connect(self._db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(
-                """
-                SELECT * FROM summaries
-                WHERE start_date = ?
-                ORDER BY id DESC
-                LIMIT 1
-                """,
-                (start,),
-            ).fetchone()
-            if not row:
-                return None
-            products = self._fetch_products(conn, row["id"])
-            return StoredSummary(
-                id=row["id"],
-                start=row["start_date"],
-                end=row["end_date"],
-                source=row["source"],
-                total_revenue=row["total_revenue"],
-                total_units=row["total_units"],
-                total_sessions=row["total_sessions"],
-                conversion_rate=row["conversion_rate"],
-                refund_rate=row["refund_rate"],
-                created_at=row["created_at"],
-                products=products,
-            )
+        if isinstance(start, str):
+            start = date.fromisoformat(start)
+        start_epoch = _date_to_epoch(start)
+        if top_n is None:
+            sql, params = _SQL_SELECT_BY_START, (start_epoch, start_epoch)
+        else:
+            sql, params = _SQL_SELECT_BY_START_TOP, (top_n, start_epoch, start_epoch)
+        conn = self._acquire_read_conn()
+        try:
+            rows = list(conn.execute(sql, params))
+        finally:
+            self._release_read_conn(conn)
+        return next(self._group_joined_rows(rows), None)
 
-    def _fetch_products(self, conn: sqlite3.Connection, summary_id: int) -> List[StoredProduct]:
+    def fetch_products_for_summaries(
+        self, ids: Sequence[int]
+    ) -> Dict[int, List[StoredProduct]]:
         """
         功能说明:
-            查询某摘要 ID 对应的商品行。
+            一次查询批量获取多条摘要对应的商品记录。
+
+            需要多条摘要商品时应优先使用本方法，而不是循环调用
+            fetch_by_start_date 逐条查询。
+        参数:
+            ids (Sequence[int]): 摘要主键 ID 列表。
+        返回:
+            Dict[int, List[StoredProduct]]: 摘要 ID 到商品列表（按销售额
+                倒序）的映射；无商品的 ID 不会出现在结果中。
+        """
+        if not ids:
+            return {}
+        conn = self._acquire_read_conn()
+        try:
+            rows = list(conn.execute(_products_in_sql(len(ids)), tuple(ids)))
+        finally:
+            self._release_read_conn(conn)
+        grouped: Dict[int, List[StoredProduct]] = defaultdict(list)
+        for row in rows:
+            grouped[row[0]].append(StoredProduct(*row[1:]))
+        return dict(grouped)
+
+    def fetch_products_columnar(self, summary_id: int) -> Dict[str, Any]:
+        """
+        功能说明:
+            以列式（SoA）结构返回某摘要的商品数据，面向纯数值分析场景。
+
+            聚合类调用方（汇总销售额、排序取 Top N 等）不需要逐行的
+            StoredProduct 对象；列式布局省去每行一个 Python 对象的分配，
+            数值列使用 array.array 紧凑存储，可直接交给 sum 等 C 级迭代。
         参数:
-            conn (sqlite3.Connection): 已开启的数据库连接。
             summary_id (int): 摘要主键 ID。
         返回:
-            List[StoredProduct]: 商品记录列表。
+            Dict[str, Any]: 列名到整列数据的映射，与 StoredProduct 字段
+                同名同序（按销售额倒序）；buy_box_percentage 可含 None，
+                保持为普通列表。
         """
-        product_rows = conn.execute(
-            """
-            SELECT asin, title, revenue, units, sessions,
-                   conversion_rate, refunds, buy_box_percentage
-            FROM products
-            WHERE summary_id = ?
-            ORDER BY revenue DESC
-            """,
-            (summary_id,),
-        )
-        return [StoredProduct(*row) for row in product_rows]
+        columns: Dict[str, Any] = {
+            "asin": [],
+            "title": [],
+            "revenue": array.array("d"),
+            "units": array.array("q"),
+            "sessions": array.array("q"),
+            "conversion_rate": array.array("d"),
+            "refunds": array.array("q"),
+            "buy_box_percentage": [],
+        }
+        conn = self._acquire_read_conn()
+        try:
+            for row in conn.execute(_SQL_SELECT_PRODUCTS, (summary_id,)):
+                columns["asin"].append(row[0])
+                columns["title"].append(row[1])
+                columns["revenue"].append(row[2])
+                columns["units"].append(row[3])
+                columns["sessions"].append(row[4])
+                columns["conversion_rate"].append(row[5])
+                columns["refunds"].append(row[6])
+                columns["buy_box_percentage"].append(row[7])
+        finally:
+            self._release_read_conn(conn)
+        return columns
+
+    @staticmethod
+    def _group_joined_rows(rows: List[tuple]) -> Iterator[StoredSummary]:
+        """
+        功能说明:
+            将 LEFT JOIN 结果按摘要 ID 分组，逐条产出 StoredSummary。
+
+            行需已按摘要排序；前 10 列为摘要字段，其后为商品字段，
+            LEFT JOIN 下无商品的摘要其商品列全部为 NULL。列顺序与
+            两个数据类的字段顺序一一对应，直接按位置构造，省去按列名
+            哈希查找的开销。
+        参数:
+            rows (List[tuple]): JOIN 查询返回的行。
+        返回:
+            Iterator[StoredSummary]: 分组后的摘要迭代器。
+        """
+        current: Optional[StoredSummary] = None
+        for row in rows:
+            if current is None or row[0] != current.id:
+                if current is not None:
+                    yield current
+                current = StoredSummary(
+                    row[0],
+                    _epoch_to_iso(row[1]),
+                    _epoch_to_iso(row[2]),
+                    *row[3:10],
+                    products=[],
+                )
+            if row[10] is not None:
+                current.products.append(StoredProduct(*row[10:]))
+        if current is not None:
+            yield current